@@ -1,11 +1,22 @@
 import os
+import copy
 import json
 import logging
+import logging.handlers
+import queue
+import random
 import re
+import atexit
+import threading
+import time
+import uuid
+from datetime import date, datetime, timezone
 from urllib.parse import urlparse
 
+import click
 from markupsafe import Markup
-from flask import Flask, jsonify, request, render_template, redirect, url_for, flash
+from flask import Flask, jsonify, request, render_template, redirect, url_for, flash, g, has_request_context
+from flask.logging import default_handler
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_admin import Admin, AdminIndexView, expose
@@ -13,18 +24,137 @@ from flask_admin.contrib.sqla import ModelView
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
 # Imports necessários para as views do Admin
-from wtforms.fields import PasswordField, TextAreaField, IntegerField, StringField
+from wtforms.fields import PasswordField, TextAreaField, IntegerField, StringField, SelectField
+from wtforms.validators import ValidationError
 
 # --- Configuração Inicial ---
 basedir = os.path.abspath(os.path.dirname(__file__))
 app = Flask(__name__)
 CORS(app)
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(basedir, 'infografico.db')
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///' + os.path.join(basedir, 'infografico.db'))
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.environ.get('FLASK_SECRET_KEY', 'SUA_CHAVE_SECRETA_SUPER_FORTE_AQUI_V12_TAGS_REFINADAS_COMPLETAS')
+app.config['LOG_SAMPLE_RATE'] = float(os.environ.get('LOG_SAMPLE_RATE', '0.1'))
+app.config['LOG_SLOW_REQUEST_MS'] = float(os.environ.get('LOG_SLOW_REQUEST_MS', '500'))
 db = SQLAlchemy(app)
-logging.basicConfig(level=logging.INFO)
+
+# --- Configuração de Logging ---
+# Os registros são enfileirados na thread da requisição; formatação (JSON) e
+# escrita no stream ficam a cargo de uma thread em segundo plano (QueueListener).
+REQUEST_LOG_FIELDS = ('request_id', 'method', 'path', 'status', 'duration_ms')
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+class JsonLogFormatter(logging.Formatter):
+    def format(self, record):
+        log_entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for field in REQUEST_LOG_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                log_entry[field] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            log_entry['exc_info'] = record.exc_text
+        return json.dumps(log_entry, ensure_ascii=False)
+
+class RequestContextFilter(logging.Filter):
+    def filter(self, record):
+        if not hasattr(record, 'request_id') and has_request_context():
+            record.request_id = g.get('request_id')
+        return True
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler cujo QueueListener é iniciado sob demanda, uma vez por processo.
+
+    Iniciar o listener no import deixaria workers de servidores pre-fork (ex.: gunicorn --preload)
+    sem a thread de escrita: ela existe só no processo pai.
+    """
+    def __init__(self, queue, *handlers):
+        super().__init__(queue)
+        self.target_handlers = handlers
+        self.listener = None
+        self.listener_pid = None
+        self.listener_lock = threading.Lock()
+        atexit.register(self.stop_listener)
+
+    def start_listener(self):
+        if self.listener_pid == os.getpid():
+            return
+        with self.listener_lock:
+            if self.listener_pid != os.getpid():
+                if self.listener_pid is not None:
+                    # Processo filho de um fork: a fila herdada traz registros que o pai ainda vai escrever.
+                    self.queue = queue.SimpleQueue()
+                self.listener = logging.handlers.QueueListener(self.queue, *self.target_handlers, respect_handler_level=True)
+                self.listener.start()
+                self.listener_pid = os.getpid()
+
+    def stop_listener(self):
+        if self.listener is not None and self.listener_pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self.listener_pid = None
+
+    def prepare(self, record):
+        # Mensagem e traceback são resolvidos aqui, enquanto args e frames ainda estão no estado
+        # do momento do log; serialização JSON e escrita ficam na thread do listener.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self.start_listener()
+        super().enqueue(record)
+
+log_queue = queue.SimpleQueue()
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(JsonLogFormatter())
+
+root_logger = logging.getLogger()
+root_logger.setLevel(logging.INFO)
+log_queue_handler = DeferredQueueHandler(log_queue, log_stream_handler)
+log_queue_handler.addFilter(RequestContextFilter())
+root_logger.addHandler(log_queue_handler)
+app.logger.removeHandler(default_handler)
 app.logger.setLevel(logging.INFO)
+# O access log do werkzeug registraria toda requisição; log_request é o único registro por requisição.
+logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+@app.before_request
+def start_request_timer():
+    incoming_request_id = request.headers.get('X-Request-ID', '')
+    g.request_id = incoming_request_id if REQUEST_ID_PATTERN.fullmatch(incoming_request_id) else uuid.uuid4().hex
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def log_request(response):
+    request_start = g.get('request_start')
+    if request_start is None:
+        return response
+    duration_ms = round((time.perf_counter() - request_start) * 1000, 2)
+    response.headers['X-Request-ID'] = g.request_id
+    if response.status_code >= 500:
+        level = logging.ERROR
+    elif response.status_code >= 400 or duration_ms >= app.config['LOG_SLOW_REQUEST_MS']:
+        level = logging.WARNING
+    elif random.random() < app.config['LOG_SAMPLE_RATE']:
+        level = logging.INFO
+    else:
+        return response
+    app.logger.log(level, "%s %s -> %s", request.method, request.path, response.status_code, extra={
+        'request_id': g.request_id, 'method': request.method, 'path': request.path,
+        'status': response.status_code, 'duration_ms': duration_ms
+    })
+    return response
 
 # --- Configuração do Login ---
 login_manager = LoginManager()
@@ -94,15 +224,81 @@ class TimelineEvent(db.Model):
     def __repr__(self):
         return f'<TimelineEvent {self.id} - {self.title[:30]}>'
 
+# --- Extração de Datas da Galeria ---
+# Datas completas ("12_09_1929", "Falencia.22_08_1961") e anos isolados ("- 1909", "(1973)", "06_1973").
+# Só anos 18xx/19xx são aceitos, para ignorar datas de captura como "Screenshot_2025-03-21".
+FULL_DATE_PATTERN = re.compile(r'(?<![0-9A-Za-z])(\d{1,2})[_./-](\d{1,2})[_./-]((?:18|19)\d{2})(?![0-9A-Za-z])')
+YEAR_PATTERN = re.compile(r'(?<![0-9A-Za-z])((?:18|19)\d{2})(?![0-9A-Za-z])')
+# Intervalos como "(1858-1943)" descrevem um período (ex.: vida de uma pessoa), não a data da imagem.
+YEAR_RANGE_PATTERN = re.compile(r'(?<![0-9A-Za-z])(?:18|19)\d{2}\s*[-–]\s*(?:18|19)\d{2}(?![0-9A-Za-z])')
+
+DATE_CONFIDENCE_HIGH = 'alta'      # dia/mês/ano encontrados
+DATE_CONFIDENCE_MEDIUM = 'media'   # apenas o ano, no nome do arquivo
+DATE_CONFIDENCE_LOW = 'baixa'      # apenas o ano, no título
+DATE_CONFIDENCE_MANUAL = 'manual'  # definido pelo admin; nunca sobrescrito pela extração
+DATE_CONFIDENCE_NONE = 'nenhuma'   # extração já feita, sem data encontrada
+DATE_CONFIDENCE_CHOICES = [
+    (DATE_CONFIDENCE_HIGH, 'Alta (data completa)'),
+    (DATE_CONFIDENCE_MEDIUM, 'Média (ano no arquivo)'),
+    (DATE_CONFIDENCE_LOW, 'Baixa (ano no título)'),
+    (DATE_CONFIDENCE_MANUAL, 'Manual (definida pelo admin)'),
+    (DATE_CONFIDENCE_NONE, 'Nenhuma (sem data encontrada)'),
+]
+
+def find_full_date(text):
+    for match in FULL_DATE_PATTERN.finditer(text):
+        day, month, year = (int(part) for part in match.groups())
+        try:
+            return date(year, month, day)
+        except ValueError:
+            continue
+    return None
+
+def extract_image_date(file_name, title=None):
+    """Retorna (year, date, confidence) a partir do nome do arquivo e do título, ou (None, None, None)."""
+    file_stem = YEAR_RANGE_PATTERN.sub(' ', os.path.splitext(file_name)[0]) if file_name else ''
+    title = YEAR_RANGE_PATTERN.sub(' ', title or '')
+    for text in (file_stem, title):
+        found_date = find_full_date(text)
+        if found_date:
+            return found_date.year, found_date, DATE_CONFIDENCE_HIGH
+    for text, confidence in ((file_stem, DATE_CONFIDENCE_MEDIUM), (title, DATE_CONFIDENCE_LOW)):
+        year_match = YEAR_PATTERN.search(text)
+        if year_match:
+            return int(year_match.group(1)), None, confidence
+    return None, None, None
+
+def date_sort_key(year, date_value):
+    """Chave inteira AAAAMMDD; imagens só com ano ficam no fim do seu ano."""
+    if year is None:
+        return None
+    return year * 10000 + (date_value.month * 100 + date_value.day if date_value else 9999)
+
+UNDATED_SORT_KEY = 99999999  # nenhuma imagem datada na galeria para servir de referência
+
 class GalleryImage(db.Model):
     __tablename__ = 'gallery_image'
+    __table_args__ = (db.Index('ix_gallery_image_date_sort', 'date_sort_key', 'chronological_order', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
-    chronological_order = db.Column(db.Integer, nullable=True, default=0)
+    chronological_order = db.Column(db.Integer, nullable=True, default=0, index=True)
     file_name = db.Column(db.String(255), nullable=False, unique=True)
     title = db.Column(db.String(255), nullable=True)
     corroboration_text = db.Column(db.Text, nullable=True)
     admin_assigned_section = db.Column(db.String(100), nullable=True, default='Geral')
     tags = db.Column(db.String(500), nullable=True)
+    year = db.Column(db.Integer, nullable=True, index=True)
+    date = db.Column(db.Date, nullable=True, index=True)
+    date_confidence = db.Column(db.String(20), nullable=True)
+    # Ordenação padrão da API, mantida por refresh_gallery_sort_keys().
+    date_sort_key = db.Column(db.Integer, nullable=True)
+
+    def apply_extracted_date(self, force=False):
+        """Preenche year/date a partir do nome e título. Datas manuais só são trocadas com force=True."""
+        if self.date_confidence == DATE_CONFIDENCE_MANUAL and not force:
+            return False
+        self.year, self.date, confidence = extract_image_date(self.file_name, self.title)
+        self.date_confidence = confidence or DATE_CONFIDENCE_NONE
+        return True
 
     def get_detected_topics(self):
         detected = set()
@@ -128,7 +324,9 @@ class GalleryImage(db.Model):
 
     def to_dict(self):
         return {
-            'id': self.id, 'chronological_order': self.chronological_order, 
+            'id': self.id, 'chronological_order': self.chronological_order,
+            'year': self.year, 'date': self.date.isoformat() if self.date else None,
+            'date_confidence': self.date_confidence,
             'fileName': self.file_name, 'title': self.title, 
             'corroboration': self.corroboration_text, 
             'admin_assigned_section': self.admin_assigned_section, 
@@ -138,6 +336,67 @@ class GalleryImage(db.Model):
     def __repr__(self):
         return f'<GalleryImage {self.id} - Tags: {self.tags}>'
 
+def ensure_gallery_date_columns():
+    """Adiciona as colunas de data da galeria (e índices) a bancos criados antes delas."""
+    existing_columns = {column['name'] for column in db.inspect(db.engine).get_columns('gallery_image')}
+    new_columns = {'year': 'INTEGER', 'date': 'DATE', 'date_confidence': 'VARCHAR(20)', 'date_sort_key': 'INTEGER'}
+    with db.engine.begin() as connection:
+        for column_name, column_type in new_columns.items():
+            if column_name not in existing_columns:
+                app.logger.info("Adicionando coluna gallery_image.%s", column_name)
+                connection.execute(db.text(f'ALTER TABLE gallery_image ADD COLUMN "{column_name}" {column_type}'))
+        for index in GalleryImage.__table__.indexes:
+            index.create(connection, checkfirst=True)
+
+def backfill_gallery_dates(force=False, only_pending=False):
+    """Extrai year/date de todas as imagens da galeria. Retorna quantas foram atualizadas."""
+    query = GalleryImage.query
+    if only_pending:
+        query = query.filter(GalleryImage.date_confidence.is_(None))
+    updated = 0
+    for image in query.all():
+        previous = (image.year, image.date, image.date_confidence)
+        if image.apply_extracted_date(force=force) and (image.year, image.date, image.date_confidence) != previous:
+            updated += 1
+    refresh_gallery_sort_keys()
+    db.session.commit()
+    return updated
+
+def refresh_gallery_sort_keys():
+    """Recalcula date_sort_key de toda a galeria (sem commit).
+
+    Imagens sem data herdam a chave da imagem datada anterior na ordem manual (ou da seguinte,
+    se não houver anterior), preservando a posição curada entre as datadas.
+    """
+    images = GalleryImage.query.order_by(GalleryImage.chronological_order, GalleryImage.id).all()
+    own_keys = [date_sort_key(image.year, image.date) for image in images]
+    anchored_keys = list(own_keys)
+    previous_key = None
+    for position, key in enumerate(own_keys):
+        previous_key = key if key is not None else previous_key
+        anchored_keys[position] = previous_key
+    next_key = None
+    for position in range(len(own_keys) - 1, -1, -1):
+        next_key = own_keys[position] if own_keys[position] is not None else next_key
+        if anchored_keys[position] is None:
+            anchored_keys[position] = next_key if next_key is not None else UNDATED_SORT_KEY
+    for image, key in zip(images, anchored_keys):
+        if image.date_sort_key != key:
+            image.date_sort_key = key
+
+def upgrade_database():
+    """Cria as tabelas, adiciona colunas novas e extrai datas pendentes da galeria.
+
+    Roda em `python app.py` e em `flask upgrade-db`; nunca no import, para que workers WSGI e
+    testes não disputem ALTER TABLE no mesmo banco.
+    """
+    db.create_all()
+    ensure_gallery_date_columns()
+    app.logger.info("Banco de dados e tabelas verificados/criados.")
+    pending_dates = backfill_gallery_dates(only_pending=True)
+    if pending_dates:
+        app.logger.info("Datas extraídas para %s imagens da galeria.", pending_dates)
+
 # --- Configuração do Flask-Admin ---
 class ProtectedAdminIndexView(AdminIndexView):
     @expose('/')
@@ -175,20 +434,49 @@ class TimelineEventAdminView(ProtectedModelView):
         super(TimelineEventAdminView, self).__init__(TimelineEvent, session, name='Eventos Timeline', **kwargs)
 
 class GalleryImageAdminView(ProtectedModelView):
-    column_list = ('id', 'admin_assigned_section', 'chronological_order', 'file_name', 'title', 'tags')
+    column_list = ('id', 'admin_assigned_section', 'year', 'date', 'date_confidence', 'chronological_order', 'file_name', 'title', 'tags')
     column_searchable_list = ('file_name', 'title', 'admin_assigned_section', 'tags')
-    column_filters = ('admin_assigned_section', 'tags')
-    column_editable_list = ('admin_assigned_section', 'chronological_order', 'title', 'corroboration_text', 'tags')
-    form_columns = ('admin_assigned_section', 'chronological_order', 'file_name', 'title', 'corroboration_text', 'tags')
+    column_filters = ('admin_assigned_section', 'tags', 'year', 'date_confidence')
+    column_editable_list = ('admin_assigned_section', 'year', 'chronological_order', 'title', 'corroboration_text', 'tags')
+    column_default_sort = [('year', False), ('date', False), ('chronological_order', False)]
+    form_columns = ('admin_assigned_section', 'year', 'date', 'date_confidence', 'chronological_order', 'file_name', 'title', 'corroboration_text', 'tags')
     form_overrides = {
         'corroboration_text': TextAreaField, 
-        'tags': StringField
+        'tags': StringField,
+        'date_confidence': SelectField
     }
     form_args = {
         'corroboration_text': {'render_kw': {'rows': 5}}, 
         'admin_assigned_section': {'description': 'Ex: Panceri, Pompeia, Geral'}, 
-        'tags': {'description': 'Tags: doc, fábrica, família'}
+        'tags': {'description': 'Tags: doc, fábrica, família'},
+        'year': {'description': 'Extraído do nome/título. Alterar o ano ou a data marca a confiança como "manual".'},
+        'date_confidence': {'choices': [('', '—')] + DATE_CONFIDENCE_CHOICES, 'description': 'Use "manual" para impedir que a extração automática sobrescreva a data.'}
     }
+
+    def on_model_change(self, form, model, is_created):
+        def changed(field_name):
+            return field_name in form and form[field_name].data != form[field_name].object_data
+
+        if not model.date_confidence:
+            model.date_confidence = None
+        if changed('year') or changed('date'):
+            model.date_confidence = DATE_CONFIDENCE_MANUAL
+            if model.date and model.year != model.date.year:
+                if changed('year'):
+                    # Falha o salvamento (inclusive na edição inline) em vez de descartar o ano informado.
+                    raise ValidationError(
+                        f"O ano {model.year} não corresponde à data {model.date:%d/%m/%Y}. Ajuste ou apague a data."
+                    )
+                model.year = model.date.year
+        elif is_created or changed('file_name') or changed('title') or changed('date_confidence'):
+            # Reextrai ao cadastrar, ao renomear ou quando o admin libera a data manual.
+            model.apply_extracted_date()
+        refresh_gallery_sort_keys()
+
+    def after_model_delete(self, model):
+        refresh_gallery_sort_keys()
+        self.session.commit()
+
     def __init__(self, session, **kwargs):
         super(GalleryImageAdminView, self).__init__(GalleryImage, session, name='Imagens Galeria', **kwargs)
 
@@ -516,7 +804,9 @@ def populate_database():
                     admin_assigned_section=image_data.get('admin_assigned_section', 'Geral'),
                     tags=image_data.get('tags')
                 )
+                new_image.apply_extracted_date()
                 db.session.add(new_image)
+        refresh_gallery_sort_keys()
 
         db.session.commit()
         app.logger.info("Banco de dados (Timeline e Galeria) populado/verificado com sucesso!")
@@ -524,6 +814,20 @@ def populate_database():
         db.session.rollback()
         app.logger.error(f"Erro CRÍTICO ao popular o banco de dados: {e}", exc_info=True)
 
+@app.cli.command('upgrade-db')
+def upgrade_db_command():
+    """Cria/atualiza o schema e extrai as datas pendentes da galeria."""
+    upgrade_database()
+    click.echo("Banco de dados atualizado.")
+
+@app.cli.command('backfill-gallery-dates')
+@click.option('--force', is_flag=True, help='Sobrescreve também as datas marcadas como manuais.')
+def backfill_gallery_dates_command(force):
+    """Extrai ano/data dos nomes e títulos das imagens da galeria."""
+    ensure_gallery_date_columns()
+    updated = backfill_gallery_dates(force=force)
+    click.echo(f"{updated} imagens da galeria atualizadas.")
+
 # --- Rotas de Autenticação ---
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -554,40 +858,53 @@ def logout():
     return redirect(url_for('login'))
 
 # --- Rotas da API ---
+GALLERY_YEAR_MIN, GALLERY_YEAR_MAX = 1000, 9999
 @app.route('/api/timeline/<section_name>', methods=['GET'])
 def get_timeline_section(section_name):
-    app.logger.info(f"API_TIMELINE: Req para seção: '{section_name}'")
     try:
         events_from_db = TimelineEvent.query.filter(TimelineEvent.section.ilike(section_name.lower())).order_by(TimelineEvent.year, TimelineEvent.id).all()
-        app.logger.info(f"API_TIMELINE: {len(events_from_db)} eventos para '{section_name.lower()}'.")
         return jsonify([event.to_dict() for event in events_from_db])
     except Exception as e:
-        app.logger.error(f"API_TIMELINE: Erro para '{section_name}': {e}", exc_info=True)
+        app.logger.error("API_TIMELINE: Erro para '%s': %s", section_name, e, exc_info=True)
         return jsonify({"erro": "Erro interno na API da timeline."}), 500
 
 @app.route('/api/gallery', methods=['GET'])
 def get_gallery_images():
-    app.logger.info("API_GALLERY: Req para galeria.")
+    year_from = request.args.get('year_from')
+    year_to = request.args.get('year_to')
     try:
-        images_from_db = GalleryImage.query.order_by(GalleryImage.chronological_order, GalleryImage.id).all()
-        app.logger.info(f"API_GALLERY: {len(images_from_db)} imagens encontradas.")
+        year_from = int(year_from) if year_from else None
+        year_to = int(year_to) if year_to else None
+        if any(year is not None and not GALLERY_YEAR_MIN <= year <= GALLERY_YEAR_MAX for year in (year_from, year_to)):
+            raise ValueError
+    except ValueError:
+        return jsonify({"erro": f"Parâmetros 'year_from' e 'year_to' devem ser anos entre {GALLERY_YEAR_MIN} e {GALLERY_YEAR_MAX}."}), 400
+    try:
+        query = GalleryImage.query
+        if year_from is not None:
+            query = query.filter(GalleryImage.year >= year_from)
+        if year_to is not None:
+            query = query.filter(GalleryImage.year <= year_to)
+        if request.args.get('order') == 'manual':
+            query = query.order_by(GalleryImage.chronological_order, GalleryImage.id)
+        else:
+            query = query.order_by(GalleryImage.date_sort_key, GalleryImage.chronological_order, GalleryImage.id)
+        images_from_db = query.all()
         return jsonify([image.to_dict() for image in images_from_db])
     except Exception as e:
-        app.logger.error(f"API_GALLERY: Erro interno: {e}", exc_info=True)
+        app.logger.error("API_GALLERY: Erro interno: %s", e, exc_info=True)
         return jsonify({"erro": "Erro interno na API da galeria."}), 500
 
 # --- Rota Principal ---
 @app.route('/')
 def index():
-    app.logger.info("Rota principal '/' acessada.")
     return render_template('index.html')
 
 # --- Inicialização ---
 if __name__ == '__main__':
     with app.app_context():
         app.logger.info("Iniciando aplicação Flask...")
-        db.create_all()
-        app.logger.info("Banco de dados e tabelas verificados/criados.")
+        upgrade_database()
         if not User.query.filter_by(username='admin').first():
             admin_user = User(username='admin')
             admin_user.set_password(os.environ.get('ADMIN_PASSWORD', 'admin_pass_fallback_123!'))
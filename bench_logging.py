@@ -0,0 +1,113 @@
+"""Mede o throughput das rotas da API com diferentes configurações de logging.
+
+Uso: python bench_logging.py [--requests 500] [--write-delay-ms 0.3]
+
+Cada linha do resultado isola um fator:
+  handler  - 'sync' (StreamHandler na thread da requisição, como o antigo basicConfig) ou 'queue' (QueueListener)
+  legado   - recoloca as duas chamadas app.logger.info com f-string que as rotas faziam por requisição
+  amostra  - LOG_SAMPLE_RATE usado pelo log_request
+O resultado vai para bench_output.txt (ignorado pelo git).
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+
+from flask import request
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+ROUTES = ['/api/timeline/panceri', '/api/gallery', '/']
+app_module = None
+legacy_calls_enabled = False
+
+def legacy_request_log():
+    if legacy_calls_enabled:
+        app_module.app.logger.info(f"API: Req para '{request.path}'")
+
+def legacy_response_log(response):
+    if legacy_calls_enabled:
+        app_module.app.logger.info(f"API: {response.content_length} bytes para '{request.path}'")
+    return response
+
+class BlockingStream:
+    """Stream em arquivo cujo write bloqueia por um tempo fixo (simula pipe/terminal lento)."""
+    def __init__(self, path, write_delay):
+        self.file = open(path, 'a', encoding='utf-8')
+        self.write_delay = write_delay
+
+    def write(self, text):
+        if self.write_delay:
+            time.sleep(self.write_delay)
+        return self.file.write(text)
+
+    def flush(self):
+        self.file.flush()
+
+def use_handler(kind, stream):
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    if kind == 'queue':
+        app_module.log_stream_handler.setStream(stream)
+        root_logger.addHandler(app_module.log_queue_handler)
+    else:
+        sync_handler = logging.StreamHandler(stream)
+        sync_handler.setFormatter(app_module.JsonLogFormatter())
+        sync_handler.addFilter(app_module.RequestContextFilter())
+        root_logger.addHandler(sync_handler)
+
+def measure(client, path, requests_count):
+    for _ in range(50):
+        client.get(path)
+    best = 0.0
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(requests_count):
+            client.get(path)
+        best = max(best, requests_count / (time.perf_counter() - start))
+    return best
+
+def main():
+    global app_module, legacy_calls_enabled
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--write-delay-ms', type=float, default=0.0)
+    args = parser.parse_args()
+
+    # O app é importado só depois de apontar DATABASE_URL para uma cópia do banco,
+    # para que o benchmark nunca escreva no infografico.db versionado.
+    bench_dir = tempfile.mkdtemp(prefix='bench_logging_')
+    db_copy = os.path.join(bench_dir, 'infografico.db')
+    shutil.copy(os.path.join(basedir, 'infografico.db'), db_copy)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + db_copy
+    import app as imported_app
+    app_module = imported_app
+    app_module.app.before_request(legacy_request_log)
+    app_module.app.after_request(legacy_response_log)
+
+    stream = BlockingStream(os.path.join(bench_dir, 'log.jsonl'), args.write_delay_ms / 1000)
+    client = app_module.app.test_client()
+    scenarios = [
+        ('sync', True, 1.0),    # equivalente ao comportamento anterior
+        ('sync', False, 1.0),   # só remove as chamadas info das rotas
+        ('queue', False, 1.0),  # só troca o handler pela fila
+        ('queue', False, 0.1),  # configuração padrão atual
+    ]
+    lines = [f"write_delay_ms={args.write_delay_ms} requests={args.requests} (melhor de 3, req/s)",
+             f"{'handler':<8}{'legado':<8}{'amostra':<9}" + ''.join(f'{route:>24}' for route in ROUTES)]
+    for kind, legacy, sample_rate in scenarios:
+        use_handler(kind, stream)
+        legacy_calls_enabled = legacy
+        app_module.app.config['LOG_SAMPLE_RATE'] = sample_rate
+        results = [measure(client, route, args.requests) for route in ROUTES]
+        lines.append(f"{kind:<8}{'sim' if legacy else 'não':<8}{sample_rate:<9}" + ''.join(f'{r:>24.0f}' for r in results))
+        print(lines[-1], flush=True)
+
+    with open(os.path.join(basedir, 'bench_output.txt'), 'a', encoding='utf-8') as output:
+        output.write('\n'.join(lines) + '\n\n')
+    shutil.rmtree(bench_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# Os testes usam um SQLite temporário; o infografico.db versionado nunca é aberto.
+test_db_dir = tempfile.mkdtemp(prefix='tecelagens_tests_')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(test_db_dir, 'test.db')
+
+
+@pytest.fixture(scope='session', autouse=True)
+def remove_test_db_dir():
+    yield
+    shutil.rmtree(test_db_dir, ignore_errors=True)
+
+
+@pytest.fixture
+def app_db():
+    from app import app, db
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield db
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app_db):
+    from app import app
+    return app.test_client()
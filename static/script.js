@@ -395,7 +395,7 @@ function renderGalleryWithContextualTopics(allImagesMasterList) {
     }
 
     const topics = { "Panceri": [], "Pompeia": [], "Scavino & Bertuzzi": [], "GERAL": [] };
-    topics["GERAL"] = [...imagesToDisplay].sort((a,b) => (a.chronological_order || 0) - (b.chronological_order || 0));
+    topics["GERAL"] = [...imagesToDisplay];
     imagesToDisplay.forEach(image => {
         (image.detected_topics || []).forEach(topicName => {
             if (topics.hasOwnProperty(topicName) && topicName !== "GERAL") {
@@ -403,9 +403,6 @@ function renderGalleryWithContextualTopics(allImagesMasterList) {
             }
         });
     });
-    for (const topicName in topics) {
-        if (topicName !== "GERAL") topics[topicName].sort((a, b) => (a.chronological_order || 0) - (b.chronological_order || 0));
-    }
 
     const topicOrder = ["Panceri", "Pompeia", "Scavino & Bertuzzi", "GERAL"];
     let topicAnimationDelayBase = 0;
@@ -479,7 +476,6 @@ async function fetchAndPopulateGallery() {
         if (!response.ok) throw new Error(`Erro HTTP ${response.status}`);
         allGalleryImagesData = await response.json();
         if (!Array.isArray(allGalleryImagesData)) allGalleryImagesData = [];
-        allGalleryImagesData.sort((a, b) => (a.chronological_order || 0) - (b.chronological_order || 0));
         populateTagFilters();
         renderGalleryWithContextualTopics(allGalleryImagesData);
         if (document.getElementById('searchBar').value) performSearch(document.getElementById('searchBar').value);
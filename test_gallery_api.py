@@ -0,0 +1,163 @@
+from datetime import date
+
+import pytest
+
+from app import (
+    DATE_CONFIDENCE_MANUAL, DATE_CONFIDENCE_NONE, GalleryImage, User, app, backfill_gallery_dates,
+    ensure_gallery_date_columns, refresh_gallery_sort_keys,
+)
+
+# Schema de gallery_image anterior às colunas de data (como no infografico.db original).
+OLD_GALLERY_SCHEMA = '''CREATE TABLE gallery_image (
+    id INTEGER NOT NULL, chronological_order INTEGER, file_name VARCHAR(255) NOT NULL,
+    title VARCHAR(255), corroboration_text TEXT, admin_assigned_section VARCHAR(100),
+    tags VARCHAR(500), PRIMARY KEY (id), UNIQUE (file_name))'''
+
+
+@pytest.fixture
+def gallery(app_db):
+    """Galeria com imagens datadas e sem data, em ordem manual diferente da cronológica."""
+    images = {}
+    for order, (key, file_name) in enumerate([
+        ('familia', 'Familia.jpg'),
+        ('relato_ano', 'Relato - 1929.png'),
+        ('relato_dia', 'Relato - 12_09_1929.png'),
+        ('obituario', 'Obituario.jpg'),
+        ('anuncio', 'Anuncio - 1909.png'),
+    ], start=1):
+        image = GalleryImage(file_name=file_name, chronological_order=order)
+        image.apply_extracted_date()
+        app_db.session.add(image)
+        images[key] = image
+    refresh_gallery_sort_keys()
+    app_db.session.commit()
+    return images
+
+
+def file_names(response):
+    return [item['fileName'] for item in response.get_json()]
+
+
+def test_year_filters(client, gallery):
+    assert file_names(client.get('/api/gallery?year_from=1920')) == [
+        'Relato - 12_09_1929.png', 'Relato - 1929.png']
+    assert file_names(client.get('/api/gallery?year_to=1920')) == ['Anuncio - 1909.png']
+    assert file_names(client.get('/api/gallery?year_from=1900&year_to=1909')) == ['Anuncio - 1909.png']
+
+
+@pytest.mark.parametrize('query', ['year_from=abc', 'year_to=1929.5', 'year_from=999', 'year_to=10000',
+                                   'year_from=99999999999999999999999'])
+def test_invalid_year_filters_return_400(client, gallery, query):
+    response = client.get(f'/api/gallery?{query}')
+    assert response.status_code == 400
+    assert 'erro' in response.get_json()
+
+
+def test_default_order_is_by_date_with_undated_rows_anchored(client, gallery):
+    # Obituario segue a imagem datada anterior (12_09_1929); Familia, sem anterior, segue a próxima (1929).
+    assert file_names(client.get('/api/gallery')) == [
+        'Anuncio - 1909.png', 'Relato - 12_09_1929.png', 'Obituario.jpg', 'Familia.jpg', 'Relato - 1929.png']
+
+
+def test_manual_order(client, gallery):
+    assert file_names(client.get('/api/gallery?order=manual')) == [
+        'Familia.jpg', 'Relato - 1929.png', 'Relato - 12_09_1929.png', 'Obituario.jpg', 'Anuncio - 1909.png']
+
+
+def test_undated_rows_are_marked_as_processed(gallery):
+    assert gallery['familia'].date_confidence == DATE_CONFIDENCE_NONE
+    assert backfill_gallery_dates(only_pending=True) == 0
+
+
+def test_backfill_keeps_manual_dates_unless_forced(app_db, gallery):
+    image = gallery['anuncio']
+    image.year, image.date_confidence = 1905, DATE_CONFIDENCE_MANUAL
+    app_db.session.commit()
+
+    backfill_gallery_dates()
+    assert (image.year, image.date_confidence) == (1905, DATE_CONFIDENCE_MANUAL)
+
+    backfill_gallery_dates(force=True)
+    assert (image.year, image.date_confidence) == (1909, 'media')
+
+
+@pytest.fixture
+def admin_client(client, app_db):
+    user = User(username='admin')
+    user.set_password('senha')
+    app_db.session.add(user)
+    app_db.session.commit()
+    client.post('/login', data={'username': 'admin', 'password': 'senha'})
+    return client
+
+
+def test_admin_inline_year_conflicting_with_date_is_rejected(admin_client, app_db, gallery):
+    image = gallery['relato_dia']
+    response = admin_client.post('/admin/galleryimage/ajax/update/', data={'list_form_pk': image.id, 'year': '1930'})
+    assert response.status_code == 500
+    app_db.session.refresh(image)
+    assert (image.year, image.date, image.date_confidence) == (1929, date(1929, 9, 12), 'alta')
+
+
+def test_admin_inline_year_on_undated_row_is_manual_and_reorders(admin_client, app_db, gallery):
+    image = gallery['familia']
+    response = admin_client.post('/admin/galleryimage/ajax/update/', data={'list_form_pk': image.id, 'year': '1900'})
+    assert response.status_code == 200
+    app_db.session.refresh(image)
+    assert (image.year, image.date_confidence) == (1900, DATE_CONFIDENCE_MANUAL)
+    assert file_names(admin_client.get('/api/gallery'))[0] == 'Familia.jpg'
+
+
+def test_admin_date_edit_sets_year(admin_client, app_db, gallery):
+    image = gallery['relato_dia']
+    admin_client.post(f'/admin/galleryimage/edit/?id={image.id}', data={
+        'file_name': image.file_name, 'chronological_order': '3', 'year': '1929', 'date': '1931-05-01',
+        'date_confidence': 'alta', 'admin_assigned_section': 'Geral',
+    })
+    app_db.session.refresh(image)
+    assert (image.year, image.date, image.date_confidence) == (1931, date(1931, 5, 1), DATE_CONFIDENCE_MANUAL)
+
+
+def recreate_old_gallery_table(app_db):
+    app_db.session.remove()
+    with app_db.engine.begin() as connection:
+        connection.execute(app_db.text('DROP TABLE gallery_image'))
+        connection.execute(app_db.text(OLD_GALLERY_SCHEMA))
+        connection.execute(app_db.text(
+            "INSERT INTO gallery_image (chronological_order, file_name) VALUES (1, 'Pompeia 1 - 25_03_1950.png')"))
+
+
+def test_ensure_gallery_date_columns_upgrades_old_schema(app_db):
+    recreate_old_gallery_table(app_db)
+    ensure_gallery_date_columns()
+    ensure_gallery_date_columns()  # idempotente
+
+    inspector = app_db.inspect(app_db.engine)
+    columns = {column['name'] for column in inspector.get_columns('gallery_image')}
+    assert {'year', 'date', 'date_confidence', 'date_sort_key'} <= columns
+    assert {'ix_gallery_image_year', 'ix_gallery_image_date_sort'} <= {
+        index['name'] for index in inspector.get_indexes('gallery_image')}
+
+    assert backfill_gallery_dates(only_pending=True) == 1
+    image = GalleryImage.query.one()
+    assert (image.year, image.date, image.date_sort_key) == (1950, date(1950, 3, 25), 19500325)
+
+
+def test_cli_upgrade_and_backfill(app_db):
+    recreate_old_gallery_table(app_db)
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=['backfill-gallery-dates'])
+    assert result.exit_code == 0
+    assert '1 imagens da galeria atualizadas.' in result.output
+
+    image = GalleryImage.query.one()
+    image.year, image.date, image.date_confidence = 1951, None, DATE_CONFIDENCE_MANUAL
+    app_db.session.commit()
+    assert '0 imagens' in runner.invoke(args=['backfill-gallery-dates']).output
+    assert '1 imagens' in runner.invoke(args=['backfill-gallery-dates', '--force']).output
+
+    result = runner.invoke(args=['upgrade-db'])
+    assert result.exit_code == 0
+    app_db.session.refresh(image)
+    assert (image.year, image.date_confidence) == (1950, 'alta')
@@ -0,0 +1,87 @@
+from datetime import date
+
+import pytest
+
+from app import extract_image_date, initial_data_to_seed
+
+# (file_name, title, year, date, date_confidence) esperados para cada imagem dos dados iniciais.
+SEED_GALLERY_DATES = [
+    ('9e02599a-823a-484c-a647-8e8205610d38.jpg', 'Família Panceri na 6ª Légua (Final Séc. XIX)', None, None, None),
+    ('Giussepe a procura de casulo, representante EBERLE - 1909.png', 'Anúncio Giuseppe Panceri - Compra de Casulos (1909)', 1909, None, 'media'),
+    ('Historia Panceri 1 - 1910.png', 'Relato Fábrica de José Panceri - Parte 1 (1910)', 1910, None, 'media'),
+    ('Historia Panceri 2 - 1910.png', 'Relato Fábrica de José Panceri - Parte 2 (1910)', 1910, None, 'media'),
+    ('A ligação entre Panceri e Eberle, dentro e fora dos comércios.png', 'Sociedade Recreio Dante (Panceri e Eberle, ~1910s)', None, None, None),
+    ('Doação Fábrica Panceri - 1917 por Giussepe Panceri.jpg', 'Doação Palla de Seda Panceri ao Cônsul Uruguaio (1917)', 1917, None, 'media'),
+    ('Visita Panceri - 1921.png', 'Visita à Fábrica José Panceri & Cia. - Parte 1 (1921)', 1921, None, 'media'),
+    ('Visita Panceri 2 - 1921.png', 'Visita à Fábrica José Panceri & Cia. - Parte 2 (1921)', 1921, None, 'media'),
+    ('Doação Fábrica Panceri - 1921 por Giussepe Panceri2.jpg', 'Doação Palla Panceri & Cia. ao Pres. Borges de Medeiros (1921)', 1921, None, 'media'),
+    ('Relato de visita pompeia 1 - 1928.png', 'Visita à Panceri & Cia (Pompeia) - Parte 1 (1928)', 1928, None, 'media'),
+    ('Relato de visita pompeia 2 - 1928.png', 'Visita à Panceri & Cia (Pompeia) - Parte 2 (1928)', 1928, None, 'media'),
+    ('Relato de visita pompeia 3 - 1928.png', 'Visita à Panceri & Cia (Pompeia) - Parte 3 (1928)', 1928, None, 'media'),
+    ('Relato panceri - 20_09_1929.png', 'Modernização Irmãos Panceri com Tear Francês (1929)', 1929, '1929-09-20', 'alta'),
+    ('Relato panceri 1 - 12_09_1929.png', 'Visita à Panceri & Cia. em Crise - Parte 1 (1929)', 1929, '1929-09-12', 'alta'),
+    ('Relato panceri 2 - 12_09_1929.png', 'Visita à Panceri & Cia. - Teares e Produtos (1929)', 1929, '1929-09-12', 'alta'),
+    ('Relato panceri 3 - 12_09_1929.png', 'Visita à Panceri & Cia. - Qualidade e Técnico (1929)', 1929, '1929-09-12', 'alta'),
+    ('Relato panceri 4 - 12_09_1929.png', 'Visita à Panceri & Cia. - Agradecimentos (1929)', 1929, '1929-09-12', 'alta'),
+    ('image.png', 'Artigo Irmãos Panceri (ID: 97a0)', None, None, None),
+    ('As Fábricas coexistiram 4 - 1931.png', 'Reclamação sobre Guias de Exportação (1931)', 1931, None, 'media'),
+    ('As Fábricas coexistiram 5 - 1937.png', 'Produtores de Tecidos de Seda em Caxias (1937)', 1937, None, 'media'),
+    ('As Fábricas coexistiram 2 - 1942.png', 'Lista de Indústrias e Operários (~1942)', 1942, None, 'media'),
+    ('Giuseppe e o inicio dos irmaos panceri.png', 'José Panceri (1858-1943) e Irmãos Panceri', None, None, None),
+    ('Pompeia 1 - 25_03_1950.png', 'Anúncio Tecelagem Pompeia - 42 Anos (1950)', 1950, '1950-03-25', 'alta'),
+    ('Pompeia 2 - 25_03_1950.png', 'Vista Fabril da Tecelagem Pompeia (1950)', 1950, '1950-03-25', 'alta'),
+    ('Pompeia 3 - 25_03_1950.png', 'Interior da Fábrica Pompeia - L. Pizzamiglio & Filho (1950)', 1950, '1950-03-25', 'alta'),
+    ('Stand Irmaos Panceri - 1950.png', 'Stand Irmãos Panceri - Festa da Uva (1950)', 1950, None, 'media'),
+    ('As Fábricas coexistiram 3 - 1956.png', 'Vista Parcial de Caxias - Indústrias (1956)', 1956, None, 'media'),
+    ('Pompeia existente em 1956.png', 'Anúncio de Natal Tecelagem Pompeia (1956)', 1956, None, 'media'),
+    ('Fabricas e coexistência - 13_09_1958.jpg', 'Saudação Indústrias Têxteis ao Pres. Gronchi (1958)', 1958, '1958-09-13', 'alta'),
+    ('As Fábricas coexistiram - 1958.png', 'Edital Sindicato Trabalhadores Têxteis (1958)', 1958, None, 'media'),
+    ('Falecimento Luiz Pizzamiglio.jpg', 'Obituário de Luiz Pizzamiglio', None, None, None),
+    ('7aa59d0e-d478-4c89-bc5c-31682a97b425.jpg', 'Falecimento Luiz Pizzamiglio (Detalhe Idade)', None, None, None),
+    ('Vva Luiz P.Falencia.22_08_1961.jpg', 'Aviso de Falência Vva. Luiz Pizzamiglio (1961)', 1961, '1961-08-22', 'alta'),
+    ('image.png', 'Edital Venda Bens Falida Vva. L. Pizzamiglio (ID: 9425)', None, None, None),
+    ('image.png', 'Tecelagem Panceri Ltda. - Natal (1962) (ID: 1bcc)', 1962, None, 'baixa'),
+    ('image.png', 'Tecelagem Panceri Ltda. - Natal (1966) (ID: cdc5)', 1966, None, 'baixa'),
+    ('Curso para desenhos - 1967.png', 'Tecelagem Panceri em Curso de Desenho (1967)', 1967, None, 'media'),
+    ('image.png', 'Tecelagem Panceri Ltda. - Natal (1969) (ID: 6ac7)', 1969, None, 'baixa'),
+    ('image.png', 'Tecelagem Panceri - Dia do Bancário (1972) (ID: 5adc)', 1972, None, 'baixa'),
+    ('image.png', 'Tecelagem Panceri na FENIT (1973) (ID: e0a7)', 1973, None, 'baixa'),
+    ('image.png', 'Tecelagem Panceri Recebe Teares Nissan (1973) (ID: 6045)', 1973, None, 'baixa'),
+    ('b3a708bc-094f-4d7a-b3bf-348880676c79.jpg', 'Anúncio FENIT', None, None, None),
+    ('Panceri_Festa da Uva 03_1975.jpg', 'Tecelagem Panceri na Festa da Uva (1975)', 1975, None, 'media'),
+    ('Crise no setor Têxtil.jpg', 'Crise Têxtil e Fechamento Panceri (Pós-1978)', 1978, None, 'baixa'),
+    ('221425a5-6116-4a75-843c-d4e11dd193a3.jpg', 'Retrocessão Setor Têxtil e Panceri (Pós-1978)', 1978, None, 'baixa'),
+    ('image.png', 'Anúncio Scavino & Bertuzzi - Tradição Gaúcha (ID: bbff)', None, None, None),
+    ('Scavino comemora seus 55 anos - 1988.jpg', 'Scavino & Bertuzzi - 55 Anos (1988)', 1988, None, 'media'),
+    ('A trama dos fios - 1.jpg', "Artigo 'A trama dos fios' - Pág 1 (1988)", 1988, None, 'baixa'),
+    ('A trama dos fios - 2.jpg', "Artigo 'A trama dos fios' - Pág 2 (1988)", 1988, None, 'baixa'),
+    ('Fabricas3.jpg', "Artigo 'História da tecelagem em mostra no Museu' (1988)", 1988, None, 'baixa'),
+    ('Historia tecelagem em Museu.jpg', 'História da Tecelagem em Mostra no Museu', None, None, None),
+    ('image.png', 'Tecelagem Panceri Ltda. - Lista (ID: 6a89)', None, None, None),
+    ('image.png', 'Anúncio Tecelagem Panceri (ID: 4008)', None, None, None),
+    ('Curiosidade Panceri.jpg', 'Tecelagem Panceri - Investimentos e Exportações', None, None, None),
+    ('História familia Panceri 1.jpg', 'História Família Panceri - Parte 1', None, None, None),
+    ('Historia familia Panceri 2.jpg', 'História Família Panceri - Parte 2', None, None, None),
+    ('Historia familia Panceri 3.jpg', 'História Família Panceri - Parte 3', None, None, None),
+]
+
+EXTRA_CASES = [
+    ('Vva Luiz P.Falencia.22_08_1961.jpg', None, 1961, '1961-08-22', 'alta'),
+    ('Mass_FalidaPizzamiglio_14_11_1961.jpg', None, 1961, '1961-11-14', 'alta'),
+    ('Panceri chamada para FENIT realizada 06_1973.jpg', None, 1973, None, 'media'),
+    ('Screenshot_2025-03-21-13-16-53-093_com.android.chrome.jpg', None, None, None, None),
+    ('Documento 31_02_1950.png', None, 1950, None, 'media'),
+    ('Retrato.jpg', 'Família (1890 - 1910)', None, None, None),
+    ('Retrato - 1895.jpg', 'Família (1890-1910)', 1895, None, 'media'),
+]
+
+
+@pytest.mark.parametrize('file_name, title, year, iso_date, confidence', SEED_GALLERY_DATES + EXTRA_CASES)
+def test_extract_image_date(file_name, title, year, iso_date, confidence):
+    expected_date = date.fromisoformat(iso_date) if iso_date else None
+    assert extract_image_date(file_name, title) == (year, expected_date, confidence)
+
+
+def test_seed_table_covers_all_gallery_images():
+    seed_items = [(item['fileName'], item.get('title')) for item in initial_data_to_seed['gallery_images']]
+    assert seed_items == [(file_name, title) for file_name, title, *_ in SEED_GALLERY_DATES]
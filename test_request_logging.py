@@ -0,0 +1,95 @@
+import json
+import logging
+
+import pytest
+
+import app as app_module
+from app import JsonLogFormatter, app
+
+
+@pytest.fixture
+def request_records(caplog, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOG_SAMPLE_RATE', 0.0)
+    monkeypatch.setitem(app.config, 'LOG_SLOW_REQUEST_MS', 60000)
+    caplog.set_level(logging.INFO)
+
+    def collect():
+        return [record for record in caplog.records if hasattr(record, 'status')]
+    return collect
+
+
+def test_routine_success_is_sampled_out(client, request_records):
+    response = client.get('/api/timeline/panceri')
+    assert response.status_code == 200
+    assert request_records() == []
+
+
+def test_routine_success_is_logged_when_sampled(client, request_records, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOG_SAMPLE_RATE', 1.0)
+    response = client.get('/api/timeline/panceri')
+    [record] = request_records()
+    assert record.levelno == logging.INFO
+    assert (record.method, record.path, record.status) == ('GET', '/api/timeline/panceri', 200)
+    assert record.request_id == response.headers['X-Request-ID']
+    assert record.duration_ms >= 0
+
+
+def test_client_errors_are_always_logged(client, request_records):
+    assert client.get('/api/gallery?year_from=abc').status_code == 400
+    assert client.get('/nao-existe').status_code == 404
+    assert [(record.levelno, record.status) for record in request_records()] == [
+        (logging.WARNING, 400), (logging.WARNING, 404)]
+
+
+def test_slow_requests_are_always_logged(client, request_records, monkeypatch):
+    monkeypatch.setitem(app.config, 'LOG_SLOW_REQUEST_MS', 0)
+    client.get('/api/timeline/panceri')
+    [record] = request_records()
+    assert record.levelno == logging.WARNING
+
+
+def test_server_errors_are_logged_with_request_id(client, request_records, monkeypatch, caplog):
+    monkeypatch.setattr(app_module.TimelineEvent, 'query', None)
+    response = client.get('/api/timeline/panceri', headers={'X-Request-ID': 'req-500'})
+    assert response.status_code == 500
+    [record] = request_records()
+    assert record.levelno == logging.ERROR
+    route_errors = [r for r in caplog.records if r.getMessage().startswith('API_TIMELINE')]
+    assert route_errors and route_errors[0].request_id == 'req-500' and route_errors[0].exc_info
+
+
+@pytest.mark.parametrize('incoming, echoed', [
+    ('abc-123_x.y', True),
+    ('a' * 65, False),
+    ('id com espaço', False),
+    ('', False),
+])
+def test_request_id_validation(client, incoming, echoed):
+    response = client.get('/api/timeline/panceri', headers={'X-Request-ID': incoming})
+    request_id = response.headers['X-Request-ID']
+    if echoed:
+        assert request_id == incoming
+    else:
+        assert request_id != incoming and len(request_id) == 32
+
+
+def test_json_formatter_fields():
+    record = logging.LogRecord('app', logging.INFO, __file__, 1, '%s %s -> %s', ('GET', '/', 200), None)
+    for field, value in {'request_id': 'abc', 'method': 'GET', 'path': '/', 'status': 200, 'duration_ms': 1.5}.items():
+        setattr(record, field, value)
+    entry = json.loads(JsonLogFormatter().format(record))
+    assert set(entry) == {'ts', 'level', 'logger', 'message', 'request_id', 'method', 'path', 'status', 'duration_ms'}
+    assert entry['message'] == 'GET / -> 200'
+
+
+def test_queue_handler_merges_args_before_enqueue():
+    items = [1]
+    record = logging.LogRecord('app', logging.INFO, __file__, 1, 'itens: %s', (items,), None)
+    prepared = app_module.log_queue_handler.prepare(record)
+    items.append(2)
+    assert (prepared.msg, prepared.args) == ('itens: [1]', None)
+    assert record.args == (items,)
+
+
+def test_werkzeug_access_log_is_silenced():
+    assert not logging.getLogger('werkzeug').isEnabledFor(logging.INFO)